@@ -14,15 +14,24 @@
 """
 
 import argparse
+import ast
+import functools
+import importlib.metadata
 import importlib.util
+import itertools
 import logging
+import marshal
+import mmap
+import multiprocessing
 import os
+import pkgutil
+import re
 import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Dict, List, Optional, Set
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -41,197 +50,263 @@ class PackageInfo:
     error_message: Optional[str] = None
 
 
+@dataclass
+class _LookupCache:
+    """Lazily computed lookups shared by the methods of one PackageManager."""
+
+    imports: Optional[Set[str]] = None
+    installed_distributions: Optional[Set[str]] = None
+    packages_distributions: Optional[Dict[str, List[str]]] = None
+    available_modules: Optional[Set[str]] = None
+    verified_packages: Dict[str, PackageInfo] = field(default_factory=dict)
+
+
 class PackageManager:
     """Manages package detection, verification, and installation."""
 
-    # Standard library packages that should not be included in requirements
-    STDLIB_PACKAGES = {
-        # Core Python standard library modules
-        "abc",
-        "argparse",
-        "array",
-        "ast",
-        "asyncio",
-        "atexit",
-        "base64",
-        "binascii",
-        "builtins",
-        "bz2",
-        "calendar",
-        "cgi",
-        "chunk",
-        "cmd",
-        "code",
-        "codecs",
-        "collections",
-        "colorsys",
-        "configparser",
-        "contextlib",
-        "copy",
-        "copyreg",
-        "csv",
-        "datetime",
-        "decimal",
-        "difflib",
-        "dis",
-        "email",
-        "encodings",
-        "enum",
-        "errno",
-        "faulthandler",
-        "fcntl",
-        "filecmp",
-        "fileinput",
-        "fnmatch",
-        "fractions",
-        "ftplib",
-        "functools",
-        "gc",
-        "getopt",
-        "getpass",
-        "gettext",
-        "glob",
-        "graphlib",
-        "gzip",
-        "hashlib",
-        "heapq",
-        "hmac",
-        "html",
-        "http",
-        "imaplib",
-        "imghdr",
-        "importlib",
-        "inspect",
-        "io",
-        "ipaddress",
-        "itertools",
-        "json",
-        "keyword",
-        "linecache",
-        "locale",
-        "logging",
-        "lzma",
-        "mailbox",
-        "marshal",
-        "math",
-        "mimetypes",
-        "mmap",
-        "modulefinder",
-        "multiprocessing",
-        "netrc",
-        "numbers",
-        "operator",
-        "optparse",
-        "os",
-        "pathlib",
-        "pdb",
-        "pickle",
-        "pickletools",
-        "pipes",
-        "pkgutil",
-        "platform",
-        "plistlib",
-        "poplib",
-        "pprint",
-        "profile",
-        "pstats",
-        "pty",
-        "pwd",
-        "py_compile",
-        "pyclbr",
-        "pydoc",
-        "queue",
-        "quopri",
-        "random",
-        "re",
-        "readline",
-        "reprlib",
-        "resource",
-        "rlcompleter",
-        "runpy",
-        "sched",
-        "secrets",
-        "select",
-        "selectors",
-        "shelve",
-        "shlex",
-        "shutil",
-        "signal",
-        "site",
-        "smtpd",
-        "smtplib",
-        "sndhdr",
-        "socket",
-        "socketserver",
-        "sqlite3",
-        "ssl",
-        "stat",
-        "statistics",
-        "string",
-        "stringprep",
-        "struct",
-        "subprocess",
-        "sys",
-        "sysconfig",
-        "tabnanny",
-        "tarfile",
-        "tempfile",
-        "termios",
-        "textwrap",
-        "threading",
-        "time",
-        "timeit",
-        "token",
-        "tokenize",
-        "trace",
-        "traceback",
-        "tracemalloc",
-        "types",
-        "typing",
-        "unicodedata",
-        "unittest",
-        "urllib",
-        "uuid",
-        "venv",
-        "warnings",
-        "wave",
-        "weakref",
-        "webbrowser",
-        "winreg",
-        "winsound",
-        "wsgiref",
-        "xml",
-        "xmlrpc",
-        "zipapp",
-        "zipfile",
-        "zipimport",
-        "zlib",
+    # Standard library modules for interpreters older than 3.10, which lack sys.stdlib_module_names
+    _STDLIB_FALLBACK = frozenset(
+        {
+            # Core Python standard library modules
+            "abc",
+            "argparse",
+            "array",
+            "ast",
+            "asyncio",
+            "atexit",
+            "base64",
+            "binascii",
+            "builtins",
+            "bz2",
+            "calendar",
+            "cgi",
+            "chunk",
+            "cmd",
+            "code",
+            "codecs",
+            "collections",
+            "colorsys",
+            "configparser",
+            "contextlib",
+            "copy",
+            "copyreg",
+            "csv",
+            "datetime",
+            "decimal",
+            "difflib",
+            "dis",
+            "email",
+            "encodings",
+            "enum",
+            "errno",
+            "faulthandler",
+            "fcntl",
+            "filecmp",
+            "fileinput",
+            "fnmatch",
+            "fractions",
+            "ftplib",
+            "functools",
+            "gc",
+            "getopt",
+            "getpass",
+            "gettext",
+            "glob",
+            "graphlib",
+            "gzip",
+            "hashlib",
+            "heapq",
+            "hmac",
+            "html",
+            "http",
+            "imaplib",
+            "imghdr",
+            "importlib",
+            "inspect",
+            "io",
+            "ipaddress",
+            "itertools",
+            "json",
+            "keyword",
+            "linecache",
+            "locale",
+            "logging",
+            "lzma",
+            "mailbox",
+            "marshal",
+            "math",
+            "mimetypes",
+            "mmap",
+            "modulefinder",
+            "multiprocessing",
+            "netrc",
+            "numbers",
+            "operator",
+            "optparse",
+            "os",
+            "pathlib",
+            "pdb",
+            "pickle",
+            "pickletools",
+            "pipes",
+            "pkgutil",
+            "platform",
+            "plistlib",
+            "poplib",
+            "pprint",
+            "profile",
+            "pstats",
+            "pty",
+            "pwd",
+            "py_compile",
+            "pyclbr",
+            "pydoc",
+            "queue",
+            "quopri",
+            "random",
+            "re",
+            "readline",
+            "reprlib",
+            "resource",
+            "rlcompleter",
+            "runpy",
+            "sched",
+            "secrets",
+            "select",
+            "selectors",
+            "shelve",
+            "shlex",
+            "shutil",
+            "signal",
+            "site",
+            "smtpd",
+            "smtplib",
+            "sndhdr",
+            "socket",
+            "socketserver",
+            "sqlite3",
+            "ssl",
+            "stat",
+            "statistics",
+            "string",
+            "stringprep",
+            "struct",
+            "subprocess",
+            "sys",
+            "sysconfig",
+            "tabnanny",
+            "tarfile",
+            "tempfile",
+            "termios",
+            "textwrap",
+            "threading",
+            "time",
+            "timeit",
+            "token",
+            "tokenize",
+            "trace",
+            "traceback",
+            "tracemalloc",
+            "types",
+            "typing",
+            "unicodedata",
+            "unittest",
+            "urllib",
+            "uuid",
+            "venv",
+            "warnings",
+            "wave",
+            "weakref",
+            "webbrowser",
+            "winreg",
+            "winsound",
+            "wsgiref",
+            "xml",
+            "xmlrpc",
+            "zipapp",
+            "zipfile",
+            "zipimport",
+            "zlib",
+        }
+    )
+
+    # Standard library packages that should not be included in requirements, plus the
+    # packaging tools that come with every environment
+    STDLIB_PACKAGES = frozenset(getattr(sys, "stdlib_module_names", _STDLIB_FALLBACK)) | {
+        "pip",
+        "setuptools",
     }
+    # Lowercased once for case-insensitive checks against distribution names
+    _STDLIB_LOWER = frozenset(name.lower() for name in STDLIB_PACKAGES)
 
-    # Package name mappings for pip installation
+    # Packaging tools that pip freeze leaves out and uninstall must not remove
+    FREEZE_EXCLUDES = frozenset({"pip", "setuptools", "wheel", "distribute"})
+
+    # Names the parser picks up that are never real packages
+    FALSE_POSITIVES = frozenset({"lowest", "new"})
+
+    # Package name mappings for pip installation, used for imports that are not
+    # installed yet; installed ones are resolved from their metadata instead
     PACKAGE_MAPPINGS = {
         "PIL": "Pillow",  # PIL should be installed as Pillow
         "gi": "PyGObject",  # gi module comes from PyGObject
+        "bs4": "beautifulsoup4",
+        "cv2": "opencv-python",
+        "Crypto": "pycryptodome",
+        "dateutil": "python-dateutil",
+        "dotenv": "python-dotenv",
+        "jwt": "PyJWT",
+        "serial": "pyserial",
+        "sklearn": "scikit-learn",
+        "yaml": "PyYAML",
     }
 
-    # Invalid package name patterns
-    INVALID_PATTERNS = {
-        "%(module)s",  # Template strings
-        "lowest",  # Common false positives
-        "%",  # Template markers
-        "$",  # Variable markers
-        "{",  # Format strings
-        "}",
-        "<",  # HTML/XML tags
-        ">",
-        "\\",  # Path separators
-        "/",
-        '"',  # Quotes
-        "'",
-        " ",  # Spaces
-        "\t",  # Tabs
-        "\n",  # Newlines
-    }
+    # Directories that hold environments, caches or build output rather than project code
+    SKIP_DIRS = frozenset(
+        {
+            ".git",
+            ".venv",
+            "venv",
+            "env",
+            "node_modules",
+            "__pycache__",
+            ".tox",
+            ".mypy_cache",
+            "site-packages",
+            "build",
+            "dist",
+            ".eggs",
+        }
+    )
+
+    # Per-file import cache, relative to the root directory; bump the version when
+    # the extraction rules or the format change so stale entries are discarded.
+    # It is stored with marshal, which is fast but not secure against crafted data,
+    # so every entry is shape-checked on load. The cache is only as trustworthy as
+    # the tree it lives in: delete it before scanning a tree from an untrusted source.
+    IMPORT_CACHE_FILE = os.path.join(".cache", "missing_modules.bin")
+    IMPORT_CACHE_VERSION = 3
+
+    # pip processes allowed to run at once when packages are retried one by one
+    MAX_PIP_PROCESSES = 4
+
+    # A top-level module name: a letter followed by word characters, within PyPI's
+    # 214 character limit. Template strings, variable markers, tags, quotes, paths and
+    # whitespace all fail to match, as do private names starting with an underscore.
+    _VALID_NAME_RE = re.compile(r"[^\W\d_]\w{0,213}")
+
+    # Line-anchored import statements, used when a file cannot be parsed with ast
+    _IMPORT_RE = re.compile(
+        rb"^[ \t]*(?:from[ \t]+([\w.]+)[ \t]+import|import[ \t]+([\w., \t]+))", re.M
+    )
+
+    # Files larger than this (bytes) are usually generated; they are scanned through
+    # a read-only mmap with the import regex instead of being parsed
+    MMAP_THRESHOLD = 256 * 1024
+
+    # Fewer changed files than this are parsed in-process, since starting
+    # the worker processes would cost more than parsing them
+    MIN_POOL_FILES = 16
 
     def __init__(self, root_dir: str):
         """Initialize the package manager.
@@ -239,8 +314,13 @@ def __init__(self, root_dir: str):
         Args:
             root_dir: Root directory to scan for Python files
         """
-        self.root_dir = Path(root_dir)
+        self.root_dir = os.fspath(root_dir)
         self.packages: Dict[str, PackageInfo] = {}
+        self._cache = _LookupCache()
+        # Outcome of the last process_packages run
+        self.successful: List[str] = []
+        self.failed: List[str] = []
+        self.skipped: List[str] = []
 
     @staticmethod
     def get_operation_results(results: Dict[str, bool]) -> tuple[int, int]:
@@ -256,6 +336,68 @@ def get_operation_results(results: Dict[str, bool]) -> tuple[int, int]:
         failed = sum(1 for v in results.values() if not v)
         return success, failed
 
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        """Normalize a distribution name as described in PEP 503.
+
+        Args:
+            name: Distribution or import name
+
+        Returns:
+            str: Lowercase name with runs of '-', '_' and '.' replaced by '-'
+        """
+        return re.sub(r"[-_.]+", "-", name).lower()
+
+    def _get_installed_distributions(self) -> Set[str]:
+        """Get the normalized names of all installed distributions.
+
+        The set is read once from importlib.metadata and reused for later lookups.
+
+        Returns:
+            Set[str]: Normalized names of the installed distributions
+        """
+        if self._cache.installed_distributions is None:
+            self._cache.installed_distributions = {
+                self.normalize_name(dist.metadata.get("Name"))
+                for dist in importlib.metadata.distributions()
+                if dist.metadata.get("Name")
+            }
+        return self._cache.installed_distributions
+
+    def _get_available_modules(self) -> Set[str]:
+        """Get the names of all top-level modules importable from sys.path.
+
+        The set is built once from the builtin modules, pkgutil.iter_modules() and
+        the import names the installed distributions declare, so most lookups are
+        a single membership test.
+
+        Returns:
+            Set[str]: Names of the builtin, importable and installed top-level modules
+        """
+        if self._cache.available_modules is None:
+            self._cache.available_modules = (
+                set(sys.builtin_module_names)
+                | {module.name for module in pkgutil.iter_modules()}
+                | self._get_packages_distributions().keys()
+            )
+        return self._cache.available_modules
+
+    def _get_packages_distributions(self) -> Dict[str, List[str]]:
+        """Get the installed top-level import names and the distributions providing them.
+
+        The mapping is read once from importlib.metadata.packages_distributions(),
+        which is only available on Python 3.10 and later.
+
+        Returns:
+            Dict[str, List[str]]: Mapping of top-level import names to distribution names
+        """
+        if self._cache.packages_distributions is None:
+            packages_distributions = getattr(importlib.metadata, "packages_distributions", None)
+            self._cache.packages_distributions = (
+                packages_distributions() if packages_distributions is not None else {}
+            )
+        return self._cache.packages_distributions
+
     def get_requirements_path(self, custom_path: Optional[str] = None) -> str:
         """Get the path to requirements.txt file.
 
@@ -269,11 +411,35 @@ def get_requirements_path(self, custom_path: Optional[str] = None) -> str:
             return os.path.abspath(custom_path)
         return os.path.join(self.root_dir, "requirements.txt")
 
-    def install_package(self, package_name: str) -> bool:
+    @staticmethod
+    def _pip_command(*args: str) -> List[str]:
+        """Build a pip command line for the running interpreter.
+
+        The version check is disabled since it queries PyPI on every invocation.
+
+        Args:
+            *args: pip subcommand and its arguments
+
+        Returns:
+            List[str]: The full command to run
+        """
+        return [sys.executable, "-m", "pip", "--disable-pip-version-check", *args]
+
+    @staticmethod
+    def _pip_stdout() -> int:
+        """Get where pip's stdout should go.
+
+        Only stderr is needed to report failures, so the progress output of large
+        installs is discarded unless debug logging will print it.
+        """
+        return subprocess.PIPE if logger.isEnabledFor(logging.DEBUG) else subprocess.DEVNULL
+
+    def install_package(self, package_name: str, no_deps: bool = False) -> bool:
         """Install a single package using pip.
 
         Args:
             package_name: Name of the package to install
+            no_deps: Skip dependency resolution, so concurrent installs do not race
 
         Returns:
             bool: True if installation succeeded, False otherwise
@@ -281,100 +447,278 @@ def install_package(self, package_name: str) -> bool:
         try:
             logger.info("Installing package: %s", package_name)
             process = subprocess.run(
-                [sys.executable, "-m", "pip", "install", package_name],
-                capture_output=True,
+                self._pip_command("install", *(["--no-deps"] if no_deps else []), package_name),
+                stdout=self._pip_stdout(),
+                stderr=subprocess.PIPE,
                 text=True,
                 check=True,
             )
             logger.debug("Installation output: %s", process.stdout)
+            self._invalidate_environment()
             return True
         except subprocess.CalledProcessError as e:
             logger.error("Installation failed: %s", str(e))
+            if e.stderr:
+                logger.debug("pip error output: %s", e.stderr.strip())
             return False
 
-    def find_python_files(self) -> List[Path]:
-        """Find all Python files recursively."""
-        logger.info("Scanning directory: %s", str(self.root_dir))
-        python_files = []
-        total_dirs = 0
-        processed_dirs = 0
+    def install_packages(self, package_names: List[str]) -> Dict[str, bool]:
+        """Install several packages with a single pip invocation.
 
-        # First count total directories for progress tracking
-        for _, _, _ in os.walk(self.root_dir):
-            total_dirs += 1
+        pip resolves all requirements together and pays its startup cost once.
+        Each package is then checked against the refreshed installed distributions.
 
-        # Now scan for Python files with progress tracking
-        for root, _, files in os.walk(self.root_dir):
-            processed_dirs += 1
-            progress = (processed_dirs / total_dirs) * 100
+        Args:
+            package_names: Names of the packages to install
 
-            if processed_dirs % 100 == 0 or processed_dirs == total_dirs:
-                logger.info("Progress: %.1f%% (%d/%d dirs)", progress, processed_dirs, total_dirs)
+        Returns:
+            Dict[str, bool]: A dictionary mapping package names to installation success status
+        """
+        if not package_names:
+            return {}
+
+        logger.info("Installing %d packages: %s", len(package_names), ", ".join(package_names))
+        process = subprocess.run(
+            self._pip_command("install", *package_names),
+            stdout=self._pip_stdout(),
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        if process.returncode != 0:
+            logger.error("Installation failed: %s", process.stderr.strip())
+        logger.debug("Installation output: %s", process.stdout)
+
+        self._invalidate_environment()
+        installed = self._get_installed_distributions()
+        results = {name: self.normalize_name(name) in installed for name in package_names}
+
+        # A single unresolvable name aborts the whole batch, so retry the failures one by one
+        failed = [name for name, success in results.items() if not success]
+        if failed and len(package_names) > 1:
+            logger.info("Retrying %d packages individually", len(failed))
+            # The retries are independent, so their downloads overlap. Without dependencies
+            # the concurrent pip runs never write the same files.
+            with ThreadPoolExecutor(
+                max_workers=min(self.MAX_PIP_PROCESSES, len(failed)), thread_name_prefix="pip"
+            ) as executor:
+                retried = list(
+                    executor.map(functools.partial(self.install_package, no_deps=True), failed)
+                )
+            results.update(zip(failed, retried))
+
+            # One final pip run resolves the dependencies of everything that installed
+            recovered = [name for name, success in zip(failed, retried) if success]
+            if recovered:
+                process = subprocess.run(
+                    self._pip_command("install", *recovered),
+                    stdout=self._pip_stdout(),
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    check=False,
+                )
+                if process.returncode != 0:
+                    # The recovered packages are installed without their dependencies,
+                    # which leaves them unusable
+                    logger.error("Installing dependencies failed: %s", process.stderr.strip())
+                    results.update(dict.fromkeys(recovered, False))
+                self._invalidate_environment()
+        return results
 
-            python_files.extend([Path(os.path.join(root, f)) for f in files if f.endswith(".py")])
+    def find_python_files(self) -> List[str]:
+        """Find all Python files recursively.
 
-        logger.info("Found %d Python files", len(python_files))
-        return python_files
+        Returns:
+            List[str]: Paths of all Python files under the root directory
+        """
+        return list(self.iter_python_files())
 
-    def is_valid_package_name(self, name: str) -> bool:
-        """Check if a package name is valid."""
-        name = name.split("#")[0].strip()
+    def iter_python_files(self) -> Iterator[str]:
+        """Yield Python files recursively as they are discovered.
 
-        if not name or name in self.STDLIB_PACKAGES:
-            return False
+        Uses a single stack-based os.scandir pass so that the file type comes
+        from the directory listing itself instead of a separate stat per entry.
+        Directories listed in SKIP_DIRS are not descended into.
 
-        if any(pattern in name for pattern in self.INVALID_PATTERNS):
-            return False
+        Yields:
+            str: Path of each Python file under the root directory
+        """
+        logger.info("Scanning directory: %s", self.root_dir)
+        found_files = 0
+        scanned_dirs = 0
+        stack = [self.root_dir]
 
-        if not any(c.isalnum() for c in name):
-            return False
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.SKIP_DIRS:
+                                stack.append(entry.path)
+                        elif entry.name.endswith(".py") and entry.is_file():
+                            found_files += 1
+                            yield entry.path
+            except OSError as e:
+                logger.warning("Cannot scan %s: %s", directory, e)
+                continue
+            scanned_dirs += 1
 
-        if not (name[0].isalpha() or name[0] == "_"):
-            return False
+            if scanned_dirs % 100 == 0:
+                logger.info("Scanning... %d dirs, %d .py files found", scanned_dirs, found_files)
+
+        logger.info("Found %d Python files in %d directories", found_files, scanned_dirs)
 
-        if name.startswith("_"):
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def is_valid_package_name(cls, name: str) -> bool:
+        """Check if a package name is valid.
+
+        Results are memoized since the same few names recur across every file.
+        """
+        name = name.split("#")[0].strip()
+
+        if not name or name in cls.STDLIB_PACKAGES or name.lower() in cls.FALSE_POSITIVES:
             return False
 
-        return True
+        return cls._VALID_NAME_RE.fullmatch(name) is not None
 
     def get_install_name(self, import_name: str) -> str:
-        """Get the correct package name for installation."""
+        """Get the correct package name for installation.
+
+        The installed metadata is preferred, PACKAGE_MAPPINGS covers names that
+        are not installed yet.
+        """
+        distributions = self._get_packages_distributions().get(import_name)
+        if distributions:
+            return distributions[0]
         return self.PACKAGE_MAPPINGS.get(import_name, import_name)
 
-    def extract_imports(self, file_path: Path) -> Set[str]:
-        """Extract imported package names from a Python file."""
-        imports = set()
+    @classmethod
+    def extract_imports(cls, file_path: str) -> Set[str]:
+        """Extract imported package names from a Python file.
+
+        The file is parsed with the ast module so multi-line and parenthesized
+        imports are handled and relative imports are ignored. Files that do not
+        parse (e.g. Python 2 sources) fall back to a regex scan, as do files
+        larger than MMAP_THRESHOLD. Only the resulting set of top-level names is
+        validated.
+        """
+        return {name for name in cls._read_imports(file_path) if cls.is_valid_package_name(name)}
+
+    @classmethod
+    def _read_imports(cls, file_path: str) -> Set[str]:
+        """Read the top-level names a file imports, before validation.
+
+        This is a classmethod so it can be sent to worker processes.
+        """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-
-                    if line.startswith(("import ", "from ")):
-                        if line.startswith("import "):
-                            # Handle multiple imports
-                            for part in line[7:].split(","):
-                                name = part.strip().split(" as ")[0]
-                                name = name.split(".")[0].split("#")[0].strip()
-                                if name and self.is_valid_package_name(name):
-                                    imports.add(name)
-                        else:
-                            # Handle from ... import ...
-                            parts = line.split()
-                            if len(parts) >= 2:
-                                name = parts[1].split(".")[0].split("#")[0].strip()
-                                if name and self.is_valid_package_name(name):
-                                    imports.add(name)
-        except Exception as e:
+            # One open per file, the size comes from the descriptor instead of another stat
+            with open(file_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size > cls.MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        names = cls._scan_imports(mapped)
+                else:
+                    names = cls._parse_imports(f.read(), file_path)
+        except (OSError, ValueError) as e:
             logger.error("Error processing %s: %s", file_path, e)
+            return set()
+
+        return names
+
+    @classmethod
+    def _extract_file_imports(cls, file_path: str) -> Tuple[str, Set[str]]:
+        """Read unvalidated imports from a file in a worker process, tagged with its path.
+
+        Results from imap_unordered arrive in completion order, so the path is
+        returned alongside the imports to match them back to the file. Validation
+        depends on the running interpreter's stdlib, so the raw names are what
+        gets cached and they are validated after loading.
+        """
+        return file_path, cls._read_imports(file_path)
 
-        return imports
+    @classmethod
+    def _parse_imports(cls, source: bytes, file_path: str) -> Set[str]:
+        """Collect top-level module names imported by source, using a single AST walk.
+
+        Parsing the raw bytes lets the compiler honour the file's encoding declaration.
+        Sources that never mention ``import`` are skipped without being parsed.
+        """
+        if b"import" not in source:
+            return set()
+
+        try:
+            tree = ast.parse(
+                source,
+                filename=file_path,
+                mode="exec",
+                type_comments=False,
+                feature_version=sys.version_info[:2],
+            )
+        except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+            # Deeply nested expressions exhaust the parser; the regex scan still works
+            logger.debug("Falling back to regex scan for %s: %s", file_path, repr(e))
+            return cls._scan_imports(source)
+
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names.update(alias.name.partition(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                names.add(node.module.partition(".")[0])
+        return names
+
+    @classmethod
+    def _scan_imports(cls, source: Union[bytes, mmap.mmap]) -> Set[str]:
+        """Collect top-level module names from source that cannot be parsed.
+
+        A single regex sweep over the whole buffer replaces a per-line loop.
+        """
+        names = set()
+        for module, imported in cls._IMPORT_RE.findall(source):
+            if module:
+                # Handle from ... import ..., relative imports split to an empty name
+                parts = [module]
+            else:
+                # Handle multiple imports
+                parts = imported.split(b",")
+            for part in parts:
+                name = part.partition(b" as ")[0].strip().partition(b".")[0]
+                if name:
+                    names.add(name.decode("ascii", "ignore"))
+        return names
 
     def verify_package(self, package_name: str) -> PackageInfo:
-        """Verify if a package is available and get its installation status."""
+        """Verify if a package is available and get its installation status.
+
+        Results are memoized per exact import name until the environment changes.
+        Names are not case-folded, since imports are case-sensitive.
+        """
+        info = self._cache.verified_packages.get(package_name)
+        if info is None:
+            info = self._cache.verified_packages[package_name] = self._check_package(package_name)
+        return info
+
+    def _check_package(self, package_name: str) -> PackageInfo:
+        """Look up a package in the environment without consulting the memo."""
         info = PackageInfo(import_name=package_name)
 
+        if package_name in self.STDLIB_PACKAGES:
+            info.is_stdlib = True
+            info.is_available = True
+            return info
+
+        # Imported, importable and installed names are set lookups, only fall back to
+        # find_spec when all of them miss
+        info.install_name = self.get_install_name(package_name)
+        if (
+            package_name in sys.modules
+            or package_name in self._get_available_modules()
+            or self.normalize_name(info.install_name) in self._get_installed_distributions()
+        ):
+            info.is_available = True
+            return info
+
         try:
             spec = importlib.util.find_spec(package_name)
             info.is_available = spec is not None
@@ -388,57 +732,250 @@ def verify_package(self, package_name: str) -> PackageInfo:
 
         return info
 
+    def _get_import_cache_path(self) -> str:
+        """Get the path to the per-file import cache.
+
+        Returns:
+            str: Full path to the cache file inside the root directory
+        """
+        return os.path.join(self.root_dir, self.IMPORT_CACHE_FILE)
+
+    def _load_import_cache(self) -> Dict[str, dict]:
+        """Load cached per-file imports from a previous run.
+
+        Returns:
+            Dict[str, dict]: Mapping of file paths to their mtime_ns, size and imports
+        """
+        try:
+            with open(self._get_import_cache_path(), "rb") as f:
+                cache = marshal.load(f)
+        except (OSError, EOFError, TypeError, ValueError):
+            return {}
+
+        if not isinstance(cache, dict) or cache.get("version") != self.IMPORT_CACHE_VERSION:
+            return {}
+        files = cache.get("files")
+        if not isinstance(files, dict):
+            return {}
+        # Malformed entries are dropped, so their files are parsed again
+        return {
+            file: entry
+            for file, entry in files.items()
+            if isinstance(file, str) and self._is_cache_entry(entry)
+        }
+
+    @staticmethod
+    def _is_cache_entry(entry: object) -> bool:
+        """Check that a cached entry has the shape written by _collect_imports.
+
+        Args:
+            entry: Value loaded from the import cache for one file
+
+        Returns:
+            bool: Whether the entry holds an int mtime_ns and size and a list of str imports
+        """
+        if not isinstance(entry, dict):
+            return False
+        imports = entry.get("imports")
+        return (
+            isinstance(entry.get("mtime_ns"), int)
+            and isinstance(entry.get("size"), int)
+            and isinstance(imports, list)
+            and all(isinstance(name, str) for name in imports)
+        )
+
+    def _save_import_cache(self, files: Dict[str, dict]) -> None:
+        """Persist per-file imports so unchanged files are not parsed again.
+
+        Args:
+            files: Mapping of file paths to their mtime_ns, size and imports
+        """
+        cache_path = self._get_import_cache_path()
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Write next to the cache and rename over it, so an interrupted run or a
+            # concurrent reader never sees a truncated file
+            with tempfile.NamedTemporaryFile(
+                "wb", dir=os.path.dirname(cache_path), delete=False
+            ) as f:
+                temp_path = f.name
+                marshal.dump({"version": self.IMPORT_CACHE_VERSION, "files": files}, f)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning("Could not write import cache %s: %s", cache_path, e)
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def refresh(self) -> None:
+        """Forget the scanned imports and environment state so the next run rescans."""
+        self._cache.imports = None
+        self.packages = {}
+        self._invalidate_environment()
+
+    def _invalidate_environment(self) -> None:
+        """Drop the cached views of the environment after packages were added or removed."""
+        self._cache = _LookupCache(imports=self._cache.imports)
+        # The import system caches directory listings, so new packages would be missed
+        importlib.invalidate_caches()
+
+    @staticmethod
+    def _parser_processes() -> int:
+        """Get the number of worker processes to parse files with.
+
+        os.cpu_count() reports every core on the machine, while containers and
+        taskset often give this process fewer; only those can run the workers.
+
+        Returns:
+            int: Number of CPUs this process may run on
+        """
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0)) or 1
+        return os.cpu_count() or 1
+
+    @staticmethod
+    def _init_parser_worker(log_level: int) -> None:
+        """Prepare a parser worker process.
+
+        The compiled patterns and name sets are class attributes, built once per
+        worker when the module is imported (or inherited as-is with fork). The log
+        level set by --verbose is not, so spawned workers would drop debug output.
+
+        Args:
+            log_level: Level of the parent's module logger
+        """
+        logger.setLevel(log_level)
+
+    def _collect_imports(self) -> Set[str]:
+        """Collect the names imported anywhere in the project.
+
+        The result is kept on the instance, so detecting and then installing in the
+        same session scans the tree only once. Call refresh() to rescan.
+
+        Returns:
+            Set[str]: Valid top-level package names imported by the project
+        """
+        if self._cache.imports is not None:
+            return self._cache.imports
+
+        cached_files = self._load_import_cache()
+        reused_files = {}
+        parsed_files = {}
+        to_parse = {}
+
+        def changed_files() -> Iterator[str]:
+            # Reuse imports of files whose modification time and size are unchanged.
+            # This runs in the pool's feeder thread, so it only writes to its own dicts.
+            for file in self.iter_python_files():
+                try:
+                    stat = os.stat(file)
+                except OSError as e:
+                    logger.error("Error processing %s: %s", file, e)
+                    continue
+                entry = cached_files.get(file)
+                if (
+                    entry
+                    and entry["mtime_ns"] == stat.st_mtime_ns
+                    and entry["size"] == stat.st_size
+                ):
+                    reused_files[file] = entry
+                else:
+                    to_parse[file] = stat
+                    yield file
+
+        # Checked once so quiet runs skip the progress bookkeeping
+        log_progress = logger.isEnabledFor(logging.INFO)
+
+        def record(results: Iterator[Tuple[str, Set[str]]]) -> None:
+            for i, (file, imports) in enumerate(results, 1):
+                stat = to_parse[file]
+                parsed_files[file] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "imports": sorted(imports),
+                }
+                # Log every 100 files, the total is unknown until the walk ends
+                if log_progress and i % 100 == 0:
+                    logger.info("Progress: %d files analyzed, %d found so far", i, len(to_parse))
+
+        logger.info("Analyzing imports from Python files...")
+        pending = changed_files()
+        first_files = list(itertools.islice(pending, self.MIN_POOL_FILES))
+        if len(first_files) < self.MIN_POOL_FILES:
+            # The walk is over and only a few files changed, typically a cached re-run
+            record(map(self._extract_file_imports, first_files))
+        else:
+            # Parse across processes since it is CPU-bound. The rest of the walk keeps feeding
+            # the pool, and results are taken in completion order so one slow file does not
+            # hold back the rest.
+            with multiprocessing.Pool(
+                processes=self._parser_processes(),
+                initializer=self._init_parser_worker,
+                initargs=(logger.level,),
+            ) as pool:
+                record(
+                    pool.imap_unordered(
+                        self._extract_file_imports,
+                        itertools.chain(first_files, pending),
+                        chunksize=64,
+                    )
+                )
+
+        logger.info(
+            "Analyzed %d changed files, reused cached imports for %d files",
+            len(parsed_files),
+            len(reused_files),
+        )
+        current_files = {**reused_files, **parsed_files}
+        all_imports = {
+            name
+            for entry in current_files.values()
+            for name in entry["imports"]
+            if self.is_valid_package_name(name)
+        }
+
+        # A re-run over an unchanged tree is then nothing more than a stat per file
+        if current_files != cached_files:
+            self._save_import_cache(current_files)
+
+        self._cache.imports = all_imports
+        return all_imports
+
     def detect_missing_packages(self) -> List[PackageInfo]:
         """Detect missing packages in the project.
 
         Returns:
             List[PackageInfo]: A list of missing package information
         """
-        # Find all Python files
-        python_files = self.find_python_files()
-        total_files = len(python_files)
-
-        # Extract imports from all files
-        all_imports = set()
-        logger.info("Analyzing imports from Python files...")
-        for i, file in enumerate(python_files, 1):
-            all_imports.update(self.extract_imports(file))
-            if i % 100 == 0 or i == total_files:  # Log every 100 files or at the end
-                progress = (i / total_files) * 100
-                logger.info("Progress: %.1f%% (%d/%d files analyzed)", progress, i, total_files)
+        all_imports = self._collect_imports()
+        log_progress = logger.isEnabledFor(logging.INFO)
 
         logger.info("Found %d unique imported packages", len(all_imports))
         logger.info("Searching for availability of %d packages...", len(all_imports))
 
-        # Verify packages in parallel using a smaller thread pool
-        completed = 0
+        # Verify packages serially: find_spec holds the GIL, so threads would only add overhead
         total_packages = len(all_imports)
         logger.info("Starting package verification...")
 
+        # Rebuilt from the current scan so imports removed from the project are dropped
+        self.packages = {}
         missing_packages = []
-        # Use a smaller number of workers to avoid overwhelming the system
-        with ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 1)) as executor:
-            future_to_package = {
-                executor.submit(self.verify_package, pkg): pkg for pkg in all_imports
-            }
-
-            for future in as_completed(future_to_package):
-                package = future_to_package[future]
-                try:
-                    info = future.result()
-                    if not info.is_available and not info.is_stdlib:
-                        missing_packages.append(info)
-                    completed += 1
-                    if completed % 10 == 0 or completed == total_packages:  # Log every 10 packages
-                        progress = (completed / total_packages) * 100
-                        logger.info(
-                            "Verification progress: %.1f%% (%d/%d packages)",
-                            progress,
-                            completed,
-                            total_packages,
-                        )
-                except Exception as e:
-                    logger.error("Error verifying %s: %s", package, e)
+        for completed, package in enumerate(all_imports, 1):
+            try:
+                info = self.verify_package(package)
+                self.packages[package] = info
+                if not info.is_available and not info.is_stdlib:
+                    missing_packages.append(info)
+            except Exception as e:
+                logger.error("Error verifying %s: %s", package, e)
+            if log_progress and (completed % 10 == 0 or completed == total_packages):
+                # Log every 10 packages
+                logger.info(
+                    "Verification progress: %.1f%% (%d/%d packages)",
+                    completed * 100 / total_packages,
+                    completed,
+                    total_packages,
+                )
 
         return missing_packages
 
@@ -454,13 +991,13 @@ def install_missing_packages(self) -> Dict[str, bool]:
         # First, detect missing packages
         missing_packages = self.detect_missing_packages()
 
-        # Install each missing package
-        for package_info in missing_packages:
-            if package_info.import_name.lower() == "new":  # Skip invalid package name
-                continue
+        install_names = [
+            package_info.install_name or package_info.import_name
+            for package_info in missing_packages
+        ]
 
-            install_name = package_info.install_name or package_info.import_name
-            results[install_name] = self.install_package(install_name)
+        # Install the packages in one pip run
+        results.update(self.install_packages(install_names))
 
         success, failed = self.get_operation_results(results)
         logger.info("Installation complete: %d succeeded, %d failed", success, failed)
@@ -469,22 +1006,26 @@ def install_missing_packages(self) -> Dict[str, bool]:
     def process_packages(self) -> bool:
         """Process all packages: verify and install if needed."""
         logger.info("Processing packages...")
-        results = {}
-
-        for package_name in self.packages:
-            logger.info("Processing: %s", package_name)
-            try:
-                package_info = self.verify_package(package_name)
-                if not package_info.is_available:
-                    install_name = package_info.install_name or package_name
-                    results[install_name] = self.install_package(install_name)
-            except Exception as e:
-                logger.error("Error processing %s: %s", package_name, str(e))
-                results[package_name] = False
+        # Share the batched install path, which also records every verified package
+        results = self.install_missing_packages()
+        self.successful, self.failed, self.skipped = [], [], []
+
+        # Classify each record once, listing every package by its import name
+        for package_name, package_info in sorted(self.packages.items()):
+            if package_info.is_available:
+                self.skipped.append(package_name)
+            elif results.get(package_info.install_name or package_name):
+                self.successful.append(package_name)
+            else:
+                self.failed.append(package_name)
 
-        success, failed = self.get_operation_results(results)
-        logger.info("Results: %d succeeded, %d failed", success, failed)
-        return all(results.values())
+        logger.info(
+            "Results: %d succeeded, %d failed, %d already available",
+            len(self.successful),
+            len(self.failed),
+            len(self.skipped),
+        )
+        return not self.failed
 
     def uninstall_all_packages(self) -> Dict[str, bool]:
         """Uninstall all non-standard library packages from the environment.
@@ -495,35 +1036,46 @@ def uninstall_all_packages(self) -> Dict[str, bool]:
         logger.info("Starting uninstallation of all non-standard library packages...")
         results = {}
 
-        try:
-            # Get list of installed packages
-            process = subprocess.run(
-                [sys.executable, "-m", "pip", "freeze"], capture_output=True, text=True, check=True
+        # Read the dist-info metadata directly rather than spawning pip freeze
+        package_names = list(
+            dict.fromkeys(
+                name
+                for name in (
+                    dist.metadata.get("Name") for dist in importlib.metadata.distributions()
+                )
+                if name
+                and name.lower() not in self._STDLIB_LOWER
+                and self.normalize_name(name) not in self.FREEZE_EXCLUDES
             )
-            installed_packages = process.stdout.strip().split("\n")
-
-            for package in installed_packages:
-                if not package:  # Skip empty lines
-                    continue
-
-                package_name = package.split("==")[0]
-                if package_name.lower() in (p.lower() for p in self.STDLIB_PACKAGES):
-                    continue  # Skip standard library packages
-
-                try:
-                    logger.info("Uninstalling package: %s", package_name)
-                    subprocess.run(
-                        [sys.executable, "-m", "pip", "uninstall", "-y", package_name],
-                        capture_output=True,
-                        check=True,
-                    )
-                    results[package_name] = True
-                except subprocess.CalledProcessError as e:
-                    logger.error("Failed to uninstall %s: %s", package_name, e)
-                    results[package_name] = False
-
-        except subprocess.CalledProcessError as e:
-            logger.error("Failed to get list of installed packages: %s", e)
+        )
+        if not package_names:
+            return results
+
+        logger.info("Uninstalling %d packages", len(package_names))
+        process = subprocess.run(
+            self._pip_command("uninstall", "-y", *package_names),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        self._invalidate_environment()
+        if process.returncode == 0:
+            return dict.fromkeys(package_names, True)
+
+        # Fall back to one call per package to find out which ones failed
+        for package_name in package_names:
+            try:
+                logger.info("Uninstalling package: %s", package_name)
+                subprocess.run(
+                    self._pip_command("uninstall", "-y", package_name),
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    check=True,
+                )
+                results[package_name] = True
+            except subprocess.CalledProcessError as e:
+                logger.error("Failed to uninstall %s: %s", package_name, e)
+                results[package_name] = False
 
         return results
 
@@ -537,7 +1089,10 @@ def clean_package_cache(self) -> bool:
         try:
             # Clean pip cache
             subprocess.run(
-                [sys.executable, "-m", "pip", "cache", "purge"], capture_output=True, check=True
+                self._pip_command("cache", "purge"),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                check=True,
             )
             logger.info("Successfully cleaned pip cache")
             return True
@@ -547,15 +1102,30 @@ def clean_package_cache(self) -> bool:
 
     def generate_requirements(self, requirements_file: str = "requirements.txt") -> None:
         """Generate requirements.txt file."""
-        requirements = [
-            info.install_name
-            for info in self.packages.values()
-            if info.is_available and not info.is_stdlib and info.install_name
-        ]
+        # Records from before an install are stale; re-verifying is served from the
+        # memo unless the environment changed since
+        self.packages = {name: self.verify_package(name) for name in self.packages}
+        requirements = sorted(
+            {
+                info.install_name
+                for info in self.packages.values()
+                if info.is_available and not info.is_stdlib and info.install_name
+            }
+        )
 
         if requirements:
-            with open(requirements_file, "w", encoding="utf-8") as f:
-                f.write("\n".join(sorted(requirements)))
+            # Stream the lines into a sibling file and rename it over the old one, so a
+            # failed run leaves the previous requirements file intact. Unlike a temporary
+            # file this keeps the usual umask permissions.
+            temp_file = f"{requirements_file}.tmp"
+            try:
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    f.writelines(f"{requirement}\n" for requirement in requirements)
+                os.replace(temp_file, requirements_file)
+            except OSError:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+                raise
             logger.info("Generated requirements file: %s", requirements_file)
         else:
             logger.info("No requirements to write")
@@ -577,16 +1147,17 @@ def display_menu() -> int:
 ║ 4. Clean Package Cache                     ║
 ║ 5. Generate Requirements File              ║
 ║ 6. Full Setup (Clean + Install Missing)    ║
-║ 7. Exit                                    ║
+║ 7. Refresh Project Scan                    ║
+║ 8. Exit                                    ║
 ╚════════════════════════════════════════════╝
 """
     while True:
         print(menu)
         try:
-            choice = int(input("Enter your choice (1-7): "))
-            if 1 <= choice <= 7:
+            choice = int(input("Enter your choice (1-8): "))
+            if 1 <= choice <= 8:
                 return choice
-            print("Please enter a number between 1 and 7")
+            print("Please enter a number between 1 and 8")
         except ValueError:
             print("Please enter a valid number")
 
@@ -658,7 +1229,11 @@ def interactive_mode(package_manager: "PackageManager"):
                 package_manager.generate_requirements(req_path)
                 print(f"Requirements file generated: {req_path}")
 
-            elif choice == 7:  # Exit
+            elif choice == 7:  # Refresh
+                package_manager.refresh()
+                print("\nProject will be rescanned on the next operation")
+
+            elif choice == 8:  # Exit
                 print("\nGoodbye!")
                 break
 
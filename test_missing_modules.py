@@ -1,18 +1,20 @@
 """Unit tests for missing_modules.py."""
 
+import marshal
 import os
 import shutil
 import subprocess
+import sys
 import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from missing_modules import PackageManager
+from missing_modules import PackageInfo, PackageManager
 
 
-class TestMissingModules(unittest.TestCase):
-    """Test cases for missing_modules.py."""
+class ManagerTestCase(unittest.TestCase):
+    """Base class providing a package manager over a temporary directory."""
 
     def setUp(self):
         """Set up test environment."""
@@ -24,6 +26,72 @@ def tearDown(self):
         # Use shutil.rmtree for recursive directory removal
         shutil.rmtree(self.test_dir, ignore_errors=True)
 
+
+class TestImportExtraction(ManagerTestCase):
+    """Test cases for extracting imports from source files."""
+
+    def test_extract_multiline_and_relative_imports(self):
+        """Test extracting parenthesized imports and skipping relative imports."""
+        test_file = Path(self.test_dir) / "test.py"
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write(
+                """
+from requests import (
+    Session,
+    get,
+)
+from . import sibling
+from .local import helper
+import numpy.linalg, yaml
+text = "import notapackage"
+"""
+            )
+
+        imports = self.manager.extract_imports(test_file)
+        self.assertEqual(imports, {"requests", "numpy", "yaml"})
+
+    def test_extract_imports_unparsable_file(self):
+        """Test the regex fallback for files that are not valid Python 3."""
+        test_file = Path(self.test_dir) / "legacy.py"
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write("import requests, numpy.linalg as la\nfrom yaml import load\nprint 'hi'\n")
+
+        imports = self.manager.extract_imports(test_file)
+        self.assertEqual(imports, {"requests", "numpy", "yaml"})
+
+    def test_extract_imports_large_file(self):
+        """Test that files above the mmap threshold are scanned as bytes."""
+        test_file = Path(self.test_dir) / "generated.py"
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write("import requests\nfrom yaml import load\n" + "x = 1\n" * 100)
+
+        with patch.object(PackageManager, "MMAP_THRESHOLD", 100):
+            imports = self.manager.extract_imports(test_file)
+        self.assertEqual(imports, {"requests", "yaml"})
+
+    def test_extract_imports_deeply_nested_file(self):
+        """Test that files too deeply nested for the parser fall back to the regex scan."""
+        test_file = Path(self.test_dir) / "nested.py"
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write("import requests\nx = " + "1 + " * 50000 + "1\n")
+
+        imports = self.manager.extract_imports(test_file)
+        self.assertEqual(imports, {"requests"})
+
+    def test_extract_imports_without_import_statement(self):
+        """Test that files without any import statement are not parsed at all."""
+        test_file = Path(self.test_dir) / "version.py"
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write("VERSION = '1.0'\n")
+
+        with patch("ast.parse") as mock_parse:
+            self.assertEqual(self.manager.extract_imports(test_file), set())
+        mock_parse.assert_not_called()
+
+
+class TestMissingModules(ManagerTestCase):
+    """Test cases for missing_modules.py."""
+
     def test_find_python_files(self):
         """Test finding Python files."""
         # Create test Python files
@@ -43,6 +111,19 @@ def test_find_python_files(self):
         self.assertTrue(any(f.endswith("test1.py") for f in file_paths))
         self.assertTrue(any(f.endswith("test2.py") for f in file_paths))
 
+    def test_find_python_files_skips_environments(self):
+        """Test that virtualenv and tooling directories are not scanned."""
+        for subdir in (".venv", "node_modules", os.path.join("pkg", "__pycache__")):
+            os.makedirs(os.path.join(self.test_dir, subdir))
+            with open(os.path.join(self.test_dir, subdir, "ignored.py"), "w", encoding="utf-8"):
+                pass
+        with open(os.path.join(self.test_dir, "pkg", "module.py"), "w", encoding="utf-8"):
+            pass
+
+        files = self.manager.find_python_files()
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].endswith("module.py"))
+
     def test_extract_imported_packages(self):
         """Test extracting imported packages."""
         # Create a test file with various import formats
@@ -90,6 +171,64 @@ def test_stdlib_packages_excluded(self):
         imports = self.manager.extract_imports(test_file)
         self.assertEqual(len(imports), 0)
 
+    def test_import_cache_reused(self):
+        """Test that unchanged files are read from the import cache."""
+        test_file = os.path.join(self.test_dir, "app.py")
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write("import os\n")
+
+        # A single file is parsed in-process without starting worker processes
+        with patch("multiprocessing.Pool") as mock_pool:
+            self.assertEqual(self.manager.detect_missing_packages(), [])
+        mock_pool.assert_not_called()
+        cache_path = os.path.join(self.test_dir, PackageManager.IMPORT_CACHE_FILE)
+        with open(cache_path, "rb") as f:
+            cache = marshal.load(f)
+        # Raw names are cached and validated after loading, so the stdlib import is kept
+        self.assertEqual(cache["files"][test_file]["imports"], ["os"])
+
+        # A cached import for the unchanged file must be picked up without re-parsing
+        cache["files"][test_file]["imports"] = ["nonexistent_package_xyz"]
+        with open(cache_path, "wb") as f:
+            marshal.dump(cache, f)
+        # Imports are memoized on the instance until refreshed
+        self.assertEqual(self.manager.detect_missing_packages(), [])
+        self.manager.refresh()
+        missing = self.manager.detect_missing_packages()
+        self.assertEqual([info.import_name for info in missing], ["nonexistent_package_xyz"])
+
+        # Nothing changed on disk, so the cache file is not rewritten
+        self.manager.refresh()
+        with patch.object(self.manager, "_save_import_cache") as mock_save:
+            self.manager.detect_missing_packages()
+        mock_save.assert_not_called()
+
+    def test_import_cache_malformed(self):
+        """Test that cache data of the wrong shape is treated as a cache miss."""
+        test_file = os.path.join(self.test_dir, "app.py")
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write("import nonexistent_package_xyz\n")
+        stat = os.stat(test_file)
+        cache_path = os.path.join(self.test_dir, PackageManager.IMPORT_CACHE_FILE)
+        os.makedirs(os.path.dirname(cache_path))
+
+        for files in (
+            [1, 2],
+            {test_file: [1, 2]},
+            {test_file: {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "imports": [5]}},
+            {test_file: {"mtime_ns": str(stat.st_mtime_ns), "size": stat.st_size, "imports": []}},
+        ):
+            with self.subTest(files=files):
+                with open(cache_path, "wb") as f:
+                    marshal.dump(
+                        {"version": PackageManager.IMPORT_CACHE_VERSION, "files": files}, f
+                    )
+                self.manager.refresh()
+                missing = self.manager.detect_missing_packages()
+                self.assertEqual(
+                    [info.import_name for info in missing], ["nonexistent_package_xyz"]
+                )
+
     def test_package_verification(self):
         """Test package verification functionality."""
         # Test stdlib package
@@ -104,10 +243,45 @@ def test_package_verification(self):
         self.assertFalse(info.is_available)
         self.assertEqual(info.install_name, "nonexistent_package_xyz")
 
+        # Repeated lookups are served from the memo
+        with patch("importlib.util.find_spec") as mock_find_spec:
+            self.assertIs(self.manager.verify_package("nonexistent_package_xyz"), info)
+        mock_find_spec.assert_not_called()
+
         # Test package with special mapping
         info = self.manager.verify_package("PIL")
         self.assertFalse(info.is_stdlib)
         self.assertEqual(info.install_name, "Pillow")
+        self.assertEqual(self.manager.get_install_name("sklearn"), "scikit-learn")
+
+    @patch("importlib.util.find_spec")
+    @patch("importlib.metadata.packages_distributions", create=True)
+    @patch("importlib.metadata.distributions")
+    def test_installed_distribution_lookup(
+        self, mock_distributions, mock_packages_distributions, mock_find_spec
+    ):
+        """Test that installed distributions are found without find_spec."""
+        dist = MagicMock()
+        dist.metadata = {"Name": "Some_Package"}
+        mock_distributions.return_value = [dist]
+        mock_packages_distributions.return_value = {"yaml": ["PyYAML"]}
+
+        info = self.manager.verify_package("some.package")
+        self.assertTrue(info.is_available)
+
+        # Import names are mapped to the distribution that provides them
+        info = self.manager.verify_package("yaml")
+        self.assertTrue(info.is_available)
+        self.assertEqual(info.install_name, "PyYAML")
+        mock_find_spec.assert_not_called()
+
+    @patch("importlib.util.find_spec")
+    def test_loaded_module_lookup(self, mock_find_spec):
+        """Test that already imported modules are found without find_spec."""
+        with patch.dict(sys.modules, {"already_loaded_module": MagicMock()}):
+            info = self.manager.verify_package("already_loaded_module")
+        self.assertTrue(info.is_available)
+        mock_find_spec.assert_not_called()
 
     def test_invalid_package_patterns(self):
         """Test detection of invalid package patterns."""
@@ -123,6 +297,8 @@ def test_invalid_package_patterns(self):
             "\t",
             " ",
             "",
+            "_private",
+            "x" * 215,
         ]
         for name in invalid_names:
             self.assertFalse(self.manager.is_valid_package_name(name))
@@ -171,5 +347,152 @@ def test_operation_results(self):
         self.assertEqual(failed, 2)
 
 
+class TestPackageOperations(ManagerTestCase):
+    """Test cases for installing, uninstalling and recording packages."""
+
+    @patch("importlib.metadata.distributions")
+    @patch("subprocess.run")
+    def test_batch_installation(self, mock_run, mock_distributions):
+        """Test installing several packages with one pip call."""
+        mock_run.side_effect = [
+            MagicMock(returncode=1, stdout="", stderr="No matching dist"),
+            subprocess.CalledProcessError(returncode=1, cmd=["pip", "install", "missing-package"]),
+        ]
+        dist = MagicMock()
+        dist.metadata = {"Name": "requests"}
+        mock_distributions.return_value = [dist]
+
+        results = self.manager.install_packages(["requests", "missing-package"])
+        self.assertEqual(results, {"requests": True, "missing-package": False})
+        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual(mock_run.call_args_list[0][0][0][-2:], ["requests", "missing-package"])
+        # Only the package that failed in the batch is retried on its own
+        self.assertEqual(mock_run.call_args_list[1][0][0][-2:], ["--no-deps", "missing-package"])
+
+    @patch("importlib.metadata.distributions")
+    @patch("subprocess.run")
+    def test_batch_installation_dependency_failure(self, mock_run, mock_distributions):
+        """Test that recovered packages fail when their dependencies cannot be installed."""
+        mock_run.side_effect = [
+            MagicMock(returncode=1, stdout="", stderr="Conflicting dependencies"),
+            MagicMock(returncode=0, stdout="", stderr=""),
+            MagicMock(returncode=1, stdout="", stderr="Conflicting dependencies"),
+        ]
+        dist = MagicMock()
+        dist.metadata = {"Name": "requests"}
+        mock_distributions.return_value = [dist]
+
+        results = self.manager.install_packages(["requests", "needs-conflict"])
+        self.assertEqual(results, {"requests": True, "needs-conflict": False})
+        self.assertEqual(mock_run.call_count, 3)
+        # The final run resolves dependencies for the package recovered without them
+        self.assertEqual(mock_run.call_args_list[2][0][0][-2:], ["install", "needs-conflict"])
+
+    @patch("importlib.metadata.distributions")
+    @patch("subprocess.run")
+    def test_batch_uninstallation(self, mock_run, mock_distributions):
+        """Test uninstalling all packages with one pip call."""
+        mock_run.return_value = MagicMock(returncode=0)
+        dists = []
+        for name in ("requests", "pip", "PyYAML", "wheel", "requests"):
+            dist = MagicMock()
+            dist.metadata = {"Name": name}
+            dists.append(dist)
+        mock_distributions.return_value = dists
+
+        results = self.manager.uninstall_all_packages()
+        self.assertEqual(results, {"requests": True, "PyYAML": True})
+        mock_run.assert_called_once()
+        self.assertEqual(mock_run.call_args[0][0][-3:], ["-y", "requests", "PyYAML"])
+
+    def test_generate_requirements(self):
+        """Test writing requirements.txt atomically."""
+        requirements_path = os.path.join(self.test_dir, "requirements.txt")
+        records = {
+            "yaml": PackageInfo("yaml", "PyYAML", is_available=True),
+            "os": PackageInfo("os", is_stdlib=True, is_available=True),
+            "requests": PackageInfo("requests", "requests", is_available=True),
+        }
+        self.manager.packages = dict(records)
+
+        # One requirement per line, stdlib skipped, and no temporary file left behind
+        with patch.object(self.manager, "verify_package", side_effect=records.get):
+            self.manager.generate_requirements(requirements_path)
+        with open(requirements_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "PyYAML\nrequests\n")
+        self.assertEqual(os.listdir(self.test_dir), ["requirements.txt"])
+
+        # A failed write keeps the previous file and removes the temporary one
+        with patch.object(self.manager, "verify_package", side_effect=records.get):
+            with patch("os.replace", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    self.manager.generate_requirements(requirements_path)
+        with open(requirements_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "PyYAML\nrequests\n")
+        self.assertEqual(os.listdir(self.test_dir), ["requirements.txt"])
+
+    @patch.object(PackageManager, "install_packages")
+    def test_process_packages(self, mock_install_packages):
+        """Test that processing batches the installs and classifies every package."""
+        with open(os.path.join(self.test_dir, "app.py"), "w", encoding="utf-8") as f:
+            f.write("import present_pkg\nimport good_pkg\nimport bad_pkg\n")
+        records = {
+            "present_pkg": PackageInfo("present_pkg", "Present-Dist", is_available=True),
+            "good_pkg": PackageInfo("good_pkg", "Good-Dist"),
+            "bad_pkg": PackageInfo("bad_pkg", "Bad-Dist"),
+        }
+        mock_install_packages.return_value = {"Bad-Dist": False, "Good-Dist": True}
+
+        with patch.object(self.manager, "verify_package", side_effect=records.get):
+            self.assertFalse(self.manager.process_packages())
+        mock_install_packages.assert_called_once()
+        self.assertCountEqual(mock_install_packages.call_args.args[0], ["Bad-Dist", "Good-Dist"])
+        # Every outcome list holds import names, whatever the distribution is called
+        self.assertEqual(self.manager.successful, ["good_pkg"])
+        self.assertEqual(self.manager.failed, ["bad_pkg"])
+        self.assertEqual(self.manager.skipped, ["present_pkg"])
+
+    @patch.object(PackageManager, "install_packages")
+    def test_install_missing_packages(self, mock_install_packages):
+        """Test that every missing package is passed to the configured pip index."""
+        with open(os.path.join(self.test_dir, "app.py"), "w", encoding="utf-8") as f:
+            f.write("import private_pkg_q\n")
+        mock_install_packages.return_value = {"private_pkg_q": True}
+
+        self.assertEqual(self.manager.install_missing_packages(), {"private_pkg_q": True})
+        mock_install_packages.assert_called_once_with(["private_pkg_q"])
+
+    @patch("importlib.metadata.distributions")
+    @patch("subprocess.run")
+    def test_install_then_generate_requirements(self, mock_run, mock_distributions):
+        """Test that packages installed after detection are written to requirements."""
+        with open(os.path.join(self.test_dir, "app.py"), "w", encoding="utf-8") as f:
+            f.write("import notinstalled_pkg_q\n")
+
+        installed = []
+        dist = MagicMock()
+        dist.metadata = {"Name": "notinstalled_pkg_q"}
+        mock_distributions.side_effect = lambda: list(installed)
+
+        def run_pip(*_args, **_kwargs):
+            installed.append(dist)
+            return MagicMock(returncode=0, stdout="", stderr="")
+
+        mock_run.side_effect = run_pip
+
+        self.assertEqual(self.manager.install_missing_packages(), {"notinstalled_pkg_q": True})
+        requirements_path = os.path.join(self.test_dir, "requirements.txt")
+        self.manager.generate_requirements(requirements_path)
+        with open(requirements_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "notinstalled_pkg_q\n")
+
+        # Imports removed from the project are dropped after a refresh and rescan
+        os.remove(os.path.join(self.test_dir, "app.py"))
+        self.manager.refresh()
+        self.assertEqual(self.manager.packages, {})
+        self.manager.detect_missing_packages()
+        self.assertEqual(self.manager.packages, {})
+
+
 if __name__ == "__main__":
     unittest.main()